@@ -1,7 +1,583 @@
-import html
+import collections
 import re
+import threading
+import time
+import uuid
+import anywidget
 import ipywidgets as widgets
-from IPython.display import display, Javascript
+import traitlets
+from IPython.display import display
+
+# Front-end half of the transcript. The kernel only ever ships deltas over the
+# widget comm. initialize() collects them per model as soon as the comm opens,
+# before any view exists, so views render from that copy without a kernel
+# round trip. Scrolling is driven directly from the message handler, so the
+# view never has to watch the rest of the notebook's DOM.
+_VIEW_ESM = """
+// Transcript chunks ([isHtml, data] pairs) per model, plus the views to
+// notify of new messages.
+const stores = new Map();
+
+function getStore(model) {
+    const key = model.get("_store_key");
+    let store = stores.get(key);
+    if (!store) {
+        // seq is the number of the last message applied without a gap.
+        store = { chunks: [], views: new Set(), seq: 0, stale: false };
+        stores.set(key, store);
+    }
+    return store;
+}
+
+const ESCAPES = { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;" };
+
+function chunkHtml([isHtml, data]) {
+    return isHtml ? data : data.replace(/[&<>"']/g, (c) => ESCAPES[c]);
+}
+
+function initialize({ model }) {
+    const store = getStore(model);
+    const sync = () => model.send({ op: "sync", seq: store.seq });
+    model.on("msg:custom", (msg) => {
+        if (msg.op === "reset") {
+            // A reset for the state this copy already has is a no-op.
+            if (!store.stale && msg.seq === store.seq) return;
+            store.chunks = msg.chunks;
+            store.seq = msg.seq;
+            store.stale = false;
+        } else if (msg.op === "append") {
+            for (const chunk of msg.chunks) store.chunks.push(chunk);
+            store.chunks.splice(0, msg.evict);
+            if (store.stale) {
+                // Still waiting for the reset.
+            } else if (msg.seq === store.seq + 1) {
+                store.seq = msg.seq;
+            } else {
+                // Messages sent before this model existed were missed.
+                store.stale = true;
+                sync();
+            }
+        }
+        store.views.forEach((apply) => apply(msg));
+    });
+    // Covers models created after text was already sent, e.g. after a page
+    // reload. The kernel answers once it is idle, and only with a reset if
+    // this copy is behind.
+    sync();
+    return () => stores.delete(model.get("_store_key"));
+}
+
+// Scroll events within this many ms of wheel/key input, of releasing the
+// mouse or a touch, or of an earlier user scroll count as the user's own
+// scrolling, so inertia and momentum scrolling are covered too.
+const USER_SCROLL_WINDOW = 500;
+
+// Pages attached right after a reset, counted from the tail; updateWindow()
+// brings in earlier ones as they come into range.
+const RESET_PAGES = 2;
+
+function cancelAnim(element) {
+    if (element.currentScrollAnim) {
+        cancelAnimationFrame(element.currentScrollAnim);
+        element.currentScrollAnim = null;
+    }
+}
+
+function animateScroll(element, finalTarget, scrollSpeed) {
+    cancelAnim(element);
+    const start = element.scrollTop;
+    const distance = finalTarget - start;
+    if (distance <= 0) return;
+
+    let duration = distance / scrollSpeed;
+    if (duration < 1000) duration = 1000;
+
+    const startTime = performance.now();
+    let lastPos = start;
+
+    function step(currentTime) {
+        // Nothing to animate while the view is scrolled out of sight.
+        if (!element.isVisible) {
+            element.currentScrollAnim = null;
+            return;
+        }
+        // Interruption Check
+        if (Math.abs(element.scrollTop - lastPos) > 1) {
+            element.currentScrollAnim = null;
+            return;
+        }
+
+        const elapsed = currentTime - startTime;
+        if (elapsed < duration) {
+            const nextPos = start + (distance * (elapsed / duration));
+            element.scrollTop = nextPos;
+            element.writtenTop = lastPos = nextPos;
+            element.currentScrollAnim = requestAnimationFrame(step);
+        } else {
+            element.scrollTop = element.writtenTop = finalTarget;
+            element.currentScrollAnim = null;
+        }
+    }
+    element.currentScrollAnim = requestAnimationFrame(step);
+}
+
+function render({ model, el }) {
+    el.style.setProperty("--transcript-font-size", model.get("font_size"));
+    el.style.setProperty("--transcript-text-color", model.get("text_color"));
+    el.style.setProperty("--transcript-bg-color", model.get("bg_color"));
+
+    const inner = document.createElement("div");
+    inner.className = "scrolling-transcript";
+    // The scroll mode lives in a variable for the scroll routine; the
+    // attribute mirrors it only for the stylesheet.
+    let scrollMode = "fast";
+    inner.setAttribute("data-scroll-mode", scrollMode);
+    inner.setAttribute("data-empty", "");
+    const topSpacer = document.createElement("div");
+    const bottomSpacer = document.createElement("div");
+    // Scroll-anchoring target that keeps a fast-mode view pinned to the end
+    // natively; see _VIEW_CSS.
+    const tail = document.createElement("div");
+    tail.className = "scrolling-transcript-tail";
+    inner.append(topSpacer, bottomSpacer, tail);
+    el.appendChild(inner);
+
+    // Chunks are grouped into pages of `page_size` chunks. Only the window
+    // pages[first..last] is attached; pages outside it are kept in memory and
+    // stood in for by spacers of their last measured height. Within a page
+    // every chunk is exactly one child node, so evicting the oldest chunks is
+    // just removing first children.
+    let pages = [];
+    let first = 0;
+    let last = -1;
+    let topHeight = 0;
+    let bottomHeight = 0;
+
+    function setSpacers() {
+        topSpacer.style.height = topHeight + "px";
+        bottomSpacer.style.height = bottomHeight + "px";
+    }
+
+    function createPage() {
+        const page = { el: document.createElement("div"), count: 0, height: 0 };
+        page.el.className = "scrolling-transcript-page";
+        pages.push(page);
+        return page;
+    }
+
+    function newPage() {
+        const page = createPage();
+        // New pages join the window only if the current tail is in it.
+        if (last === pages.length - 2) {
+            bottomSpacer.before(page.el);
+            last = pages.length - 1;
+        }
+        return page;
+    }
+
+    function tailPage() {
+        const capacity = model.get("page_size") || Infinity;
+        const page = pages[pages.length - 1];
+        return page && page.count < capacity ? page : newPage();
+    }
+
+    // Set by resetPages() while pages above the window have no height yet.
+    let unmeasured = false;
+
+    function resetPages(chunks) {
+        pages.forEach((page) => page.el.remove());
+        pages = [];
+        const capacity = model.get("page_size") || Infinity;
+        for (let i = 0; i < chunks.length; i += capacity) {
+            const slice = chunks.slice(i, i + capacity);
+            const page = createPage();
+            page.el.innerHTML = "<span>" + slice.map(chunkHtml).join("</span><span>") + "</span>";
+            page.count = slice.length;
+        }
+        first = Math.max(0, pages.length - RESET_PAGES);
+        last = pages.length - 1;
+        for (let i = first; i <= last; i++) bottomSpacer.before(pages[i].el);
+        unmeasured = first > 0;
+        topHeight = bottomHeight = 0;
+        setSpacers();
+    }
+
+    function evictOldest(n) {
+        for (let i = 0; i < n && pages.length; i++) {
+            const page = pages[0];
+            page.el.firstChild.remove();
+            if (--page.count > 0) continue;
+            pages.shift();
+            if (first > 0) {
+                topHeight = Math.max(0, topHeight - page.height);
+                first--;
+                last--;
+            } else if (last >= 0) {
+                page.el.remove();
+                last--;
+            } else {
+                bottomHeight = Math.max(0, bottomHeight - page.height);
+            }
+        }
+        setSpacers();
+    }
+
+    // Attach every page below the window, e.g. before jumping to the tail.
+    function attachTail() {
+        while (last < pages.length - 1) {
+            last++;
+            bottomSpacer.before(pages[last].el);
+        }
+        bottomHeight = 0;
+        setSpacers();
+    }
+
+    // Detach pages more than one viewport away and re-attach those coming
+    // back into range, keeping scroll offsets stable through the spacers.
+    // Everything is measured before the first DOM change, so a pass costs a
+    // single layout however many pages move.
+    function updateWindow() {
+        if (!model.get("page_size")) return;
+        const view = el.getBoundingClientRect();
+        const lo = view.top - el.clientHeight;
+        const hi = view.top + 2 * el.clientHeight;
+        const topEdge = topSpacer.getBoundingClientRect().bottom;
+        const bottomEdge = bottomSpacer.getBoundingClientRect().top;
+        const rects = [];
+        let total = 0;
+        for (let i = first; i <= last; i++) {
+            const rect = pages[i].el.getBoundingClientRect();
+            pages[i].height = rect.height;
+            total += rect.height;
+            rects.push(rect);
+        }
+
+        // Pages left above the window by resetPages() were never laid out;
+        // they stand in at the average height of the attached ones.
+        const resized = unmeasured && total > 0;
+        if (resized) {
+            const estimate = total / rects.length;
+            for (let i = 0; i < first; i++) pages[i].height = estimate;
+            topHeight = first * estimate;
+            unmeasured = false;
+        }
+
+        let newFirst = first;
+        while (newFirst < last && rects[newFirst - first].bottom < lo) newFirst++;
+        let newLast = last;
+        while (newLast > newFirst && rects[newLast - first].top > hi) newLast--;
+        if (newFirst === first && !unmeasured) {
+            for (let y = topEdge; newFirst > 0 && y > lo; ) y -= pages[--newFirst].height;
+        }
+        if (newLast === last) {
+            for (let y = bottomEdge; newLast < pages.length - 1 && y < hi; ) y += pages[++newLast].height;
+        }
+        if (newFirst === first && newLast === last) {
+            if (resized) setSpacers();
+            return;
+        }
+
+        for (let i = first; i < newFirst; i++) {
+            topHeight += pages[i].height;
+            pages[i].el.remove();
+        }
+        for (let i = first - 1; i >= newFirst; i--) {
+            topHeight = Math.max(0, topHeight - pages[i].height);
+            topSpacer.after(pages[i].el);
+        }
+        for (let i = last; i > newLast; i--) {
+            bottomHeight += pages[i].height;
+            pages[i].el.remove();
+        }
+        for (let i = last + 1; i <= newLast; i++) {
+            bottomHeight = Math.max(0, bottomHeight - pages[i].height);
+            bottomSpacer.before(pages[i].el);
+        }
+        first = newFirst;
+        last = newLast;
+        setSpacers();
+    }
+
+    function setScrollMode(mode) {
+        if (mode === scrollMode) return;
+        scrollMode = mode;
+        inner.setAttribute("data-scroll-mode", mode);
+    }
+
+    // Whether the view keeps up with the tail in slow mode. Only user input
+    // changes it, so text that piles up while the view is hidden cannot
+    // unstick it.
+    let following = true;
+    let lastUserInput = -Infinity;
+    let pointerHeld = false;
+    let userScrolled = false;
+    let catchUp = false;
+
+    function isUserScrolling() {
+        return pointerHeld || performance.now() - lastUserInput < USER_SCROLL_WINDOW;
+    }
+
+    function isNearBottom() {
+        const target = el.scrollHeight - el.clientHeight;
+        return el.scrollTop > target - model.get("sticky_threshold");
+    }
+
+    function scrollToTail() {
+        if (!el.isVisible) return;
+        const jump = catchUp;
+        catchUp = false;
+        if (scrollMode === "fast") {
+            // Anchoring on the tail normally keeps the view at the end; jump
+            // only for browsers without overflow-anchor and views the user
+            // scrolled away from.
+            if (!tailVisible) {
+                attachTail();
+                el.scrollTop = el.writtenTop = el.scrollHeight - el.clientHeight;
+            }
+        } else {
+            // Sticky Scroll Logic
+            const target = el.scrollHeight - el.clientHeight;
+            if (!following || el.scrollTop >= target - 2) return;
+            if (jump && target - el.scrollTop > el.clientHeight) {
+                // Back from being hidden with more than a screen of new
+                // text: jump rather than pan through all of it.
+                cancelAnim(el);
+                el.scrollTop = el.writtenTop = target;
+            } else {
+                animateScroll(el, target, model.get("scroll_speed"));
+            }
+        }
+    }
+
+    // Bursts of messages and scroll events in the same frame share a single
+    // layout pass.
+    let frame = 0;
+    let tailPending = false;
+    function scheduleFrame(toTail) {
+        if (toTail) tailPending = true;
+        if (frame) return;
+        frame = requestAnimationFrame(() => {
+            frame = 0;
+            if (!el.isVisible) return;
+            if (userScrolled) {
+                userScrolled = false;
+                following = isNearBottom();
+            }
+            if (tailPending) {
+                tailPending = false;
+                scrollToTail();
+            }
+            updateWindow();
+        });
+    }
+
+    // Offscreen views keep applying updates but skip all scroll work; they
+    // catch up to the tail once they come back into view.
+    el.isVisible = true;
+    const io = new IntersectionObserver((entries) => {
+        el.isVisible = entries[entries.length - 1].isIntersecting;
+        if (el.isVisible) {
+            catchUp = true;
+            scheduleFrame(true);
+        } else {
+            cancelAnim(el);
+        }
+    });
+    io.observe(el);
+
+    const handleUserScroll = () => {
+        cancelAnim(el);
+        lastUserInput = performance.now();
+    };
+    // A pressed mouse button or finger covers scrollbar drags and swipes of
+    // any length; the release is caught on the window since it may happen
+    // outside the view.
+    const handlePress = () => {
+        handleUserScroll();
+        pointerHeld = true;
+    };
+    const handleRelease = () => {
+        if (!pointerHeld) return;
+        pointerHeld = false;
+        lastUserInput = performance.now();
+    };
+    el.addEventListener("wheel", handleUserScroll, { passive: true });
+    el.addEventListener("keydown", handleUserScroll, { passive: true });
+    el.addEventListener("mousedown", handlePress, { passive: true });
+    el.addEventListener("touchstart", handlePress, { passive: true });
+    for (const type of ["mouseup", "touchend", "touchcancel"]) {
+        window.addEventListener(type, handleRelease, { passive: true });
+    }
+
+    // Tracks whether the tail sentinel is on screen. If it drops out of view
+    // without user input, text was appended and anchoring did not hold, so
+    // fast mode still needs its jump.
+    let tailVisible = true;
+    const tailIo = new IntersectionObserver((entries) => {
+        tailVisible = entries[entries.length - 1].isIntersecting;
+        if (!tailVisible && scrollMode === "fast" && !isUserScrolling()) scheduleFrame(true);
+    }, { root: el });
+    tailIo.observe(tail);
+
+    // Scroll events that land where the view itself last scrolled to are
+    // its own; any other position near user input belongs to the user and
+    // extends the input window, which keeps momentum scrolling attributed.
+    el.addEventListener("scroll", () => {
+        const own = Math.abs(el.scrollTop - el.writtenTop) <= 1;
+        if (pointerHeld || (!own && isUserScrolling())) {
+            lastUserInput = performance.now();
+            userScrolled = true;
+        }
+        scheduleFrame(false);
+    }, { passive: true });
+
+    function apply(msg) {
+        if (msg.op === "reset") {
+            resetPages(msg.chunks);
+        } else if (msg.op === "append") {
+            for (const [isHtml, data] of msg.chunks) {
+                const page = tailPage();
+                if (isHtml) {
+                    const span = document.createElement("span");
+                    span.innerHTML = data;
+                    page.el.appendChild(span);
+                } else {
+                    // Plain chunks skip the HTML parser entirely.
+                    page.el.appendChild(document.createTextNode(data));
+                }
+                page.count++;
+            }
+            evictOldest(msg.evict);
+        }
+        inner.toggleAttribute("data-empty", pages.length === 0);
+        scheduleFrame(true);
+    }
+
+    const store = getStore(model);
+    store.views.add(apply);
+    apply({ op: "reset", chunks: store.chunks });
+
+    setScrollMode(model.get("scroll_mode"));
+    model.on("change:scroll_mode", () => {
+        setScrollMode(model.get("scroll_mode"));
+        scheduleFrame(true);
+    });
+
+    return () => {
+        store.views.delete(apply);
+        io.disconnect();
+        tailIo.disconnect();
+        for (const type of ["mouseup", "touchend", "touchcancel"]) {
+            window.removeEventListener(type, handleRelease);
+        }
+        cancelAnimationFrame(frame);
+        cancelAnim(el);
+    };
+}
+export default { initialize, render };
+"""
+
+# Static styling shared by every transcript; per-instance theme values come in
+# as CSS variables, so updates never touch inline styles.
+_VIEW_CSS = """
+.scrolling-transcript {
+    font-family: Inter, -apple-system, sans-serif;
+    font-size: var(--transcript-font-size);
+    line-height: 1.6;
+    color: var(--transcript-text-color);
+    background-color: var(--transcript-bg-color);
+    padding: 5px;
+    border-radius: 4px;
+    white-space: pre-wrap;
+}
+/* In fast mode only the tail may serve as scroll anchor, so a view resting at
+   the bottom stays there as text is appended without any script. Slow mode
+   leaves anchoring alone and animates instead. */
+.scrolling-transcript[data-scroll-mode="fast"] > * {
+    overflow-anchor: none;
+}
+.scrolling-transcript[data-scroll-mode="fast"] > .scrolling-transcript-tail {
+    overflow-anchor: auto;
+}
+.scrolling-transcript-tail {
+    height: 1px;
+}
+.scrolling-transcript[data-empty]::before {
+    content: "Waiting for stream...";
+    color: #888;
+    font-style: italic;
+}
+"""
+
+
+# Newlines are flattened to spaces for a continuous stream of text.
+_NEWLINE_TABLE = str.maketrans({"\n": " "})
+
+# html.escape() plus the newline flattening above, in a single C-level pass.
+_HTML_ESCAPE_TABLE = str.maketrans({
+    "\n": " ",
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+
+# Appends are held back for about one frame so bursts go out as one message.
+_BATCH_INTERVAL = 0.016
+# Outside live mode nobody is watching a pan, so history is batched far more
+# coarsely; set_live_mode() and flush() still send it immediately.
+_HISTORY_BATCH_INTERVAL = 0.25
+# A widget's flusher thread exits after this many idle seconds; the next
+# append starts a new one.
+_FLUSHER_IDLE_TIMEOUT = 30.0
+
+# Upper bound on distinct `styles` dicts remembered per widget.
+_STYLE_CACHE_SIZE = 32
+
+
+def _check_positive_int(name, value):
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+        raise ValueError(f"{name} must be a positive int or None, got {value!r}")
+    return value
+
+
+def _style_to_css(st):
+    parts = []
+    if st.get("color"): parts.append(f"color:{st['color']}")
+    bg = st.get("bg") or st.get("background")
+    if bg: parts.append(f"background:{bg};padding:0 2px;border-radius:2px")
+    if st.get("bold"): parts.append("font-weight:700")
+    if st.get("italic"): parts.append("font-style:italic")
+    if st.get("underline"): parts.append("text-decoration:underline")
+    return ";".join(parts)
+
+
+class _TranscriptView(anywidget.AnyWidget):
+    """DOM widget that applies `reset` / `append` messages from the kernel."""
+    _esm = _VIEW_ESM
+    _css = _VIEW_CSS
+
+    # Identifies this model's transcript copy on the page.
+    _store_key = traitlets.Unicode().tag(sync=True)
+    scroll_mode = traitlets.Unicode("fast").tag(sync=True)
+
+    font_size = traitlets.Unicode("18px").tag(sync=True)
+    text_color = traitlets.Unicode("#e0e0e0").tag(sync=True)
+    bg_color = traitlets.Unicode("#2b2b2b").tag(sync=True)
+
+    scroll_speed = traitlets.Float(0.05).tag(sync=True)
+    sticky_threshold = traitlets.Float(150).tag(sync=True)
+    page_size = traitlets.Int(None, allow_none=True).tag(sync=True)
+
+    @traitlets.validate("page_size")
+    def _validate_page_size(self, proposal):
+        return _check_positive_int("page_size", proposal["value"])
+
+    @traitlets.default("_store_key")
+    def _default_store_key(self):
+        return uuid.uuid4().hex
+
 
 class ScrollingTranscriptWidget:
     """
@@ -10,7 +586,7 @@ class ScrollingTranscriptWidget:
     - Sticky scroll (pauses auto-scroll when user scrolls up)
     - High-performance rendering
     """
-    def __init__(self, height="500px", font_size="18px", theme="dark", scroll_speed=0.05, sticky_threshold=150):
+    def __init__(self, height="500px", font_size="18px", theme="dark", scroll_speed=0.05, sticky_threshold=150, max_chunks=None, page_size=None):
         """
         Args:
             height (str): CSS height of the widget (e.g. "500px").
@@ -18,11 +594,16 @@ class ScrollingTranscriptWidget:
             theme (str): "dark" or "light".
             scroll_speed (float): Pixels per millisecond for the slow scroll. 0.05 = 50px/sec.
             sticky_threshold (int): Distance from bottom in pixels to consider "at the bottom".
+            max_chunks (int): Optional cap on retained chunks; the oldest are dropped first. None keeps everything.
+            page_size (int): Optional number of chunks per rendered page. Pages far outside the viewport are
+                             detached from the DOM. Each page starts on a new line. None renders one continuous page.
         """
         self.height = height
         self.font_size = font_size
         self.scroll_speed = scroll_speed
         self.sticky_threshold = sticky_threshold
+        self.max_chunks = _check_positive_int("max_chunks", max_chunks)
+        self.page_size = _check_positive_int("page_size", page_size)
         
         # Theme configuration
         if theme == "dark":
@@ -32,103 +613,41 @@ class ScrollingTranscriptWidget:
             self.text_color = "#222222"
             self.bg_color = "#ffffff"
             
-        self.chunks = {} 
-        self.chunk_ids = []
+        self.chunks = collections.deque(maxlen=self.max_chunks)
+        self._style_cache = {}
+        # Chunks appended since the last batch was sent, plus how many chunks
+        # max_chunks pushed out meanwhile. Guarded by _lock, which also keeps
+        # messages in order between callers and the flusher thread.
+        self._pending = []
+        self._pending_evictions = 0
+        # Sequence number of the last transcript state sent. Every append bumps
+        # it; the frontend reports the last one it has when it asks to sync.
+        self._seq = 0
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flusher = None
         self.auto_scroll_enabled = True
         self.is_live = False # Toggled manually or by logic
         
-        self.html_widget = widgets.HTML(
-            value=f"<div style='color: #888; font-style: italic;'>Waiting for stream...</div>",
+        self.html_widget = _TranscriptView(
+            font_size=self.font_size,
+            text_color=self.text_color,
+            bg_color=self.bg_color,
+            scroll_speed=self.scroll_speed,
+            sticky_threshold=self.sticky_threshold,
+            page_size=self.page_size,
             layout=widgets.Layout(height=self.height, overflow="auto", width="100%")
         )
+        self.html_widget.on_msg(self._handle_msg)
         self.container_id = f"transcript-render-{id(self)}"
         
     def setup(self):
-        """Initializes the widget and injects the scrolling JavaScript."""
+        """Initializes and displays the widget."""
         # Unique class for this instance to avoid collisions
         self.unique_class = f"transcript-scroll-{id(self)}"
         self.html_widget.add_class(self.unique_class)
         
         display(self.html_widget)
-        self._inject_js()
-
-    def _inject_js(self):
-        js = f"""
-        (function() {{
-            const targetClass = '{self.unique_class}';
-            const SCROLL_SPEED = {self.scroll_speed}; 
-            const STICKY_THRESHOLD = {self.sticky_threshold};
-
-            function cancelAnim(element) {{
-                if (element.currentScrollAnim) {{
-                    cancelAnimationFrame(element.currentScrollAnim);
-                    element.currentScrollAnim = null;
-                }}
-            }}
-
-            function animateScroll(element, finalTarget) {{
-                 cancelAnim(element);
-                 const start = element.scrollTop;
-                 const distance = finalTarget - start;
-                 if (distance <= 0) return;
-
-                 let duration = distance / SCROLL_SPEED;
-                 if (duration < 1000) duration = 1000; 
-                 
-                 const startTime = performance.now();
-                 let lastPos = start;
-                 
-                 function step(currentTime) {{
-                    // Interruption Check
-                    if (Math.abs(element.scrollTop - lastPos) > 1) {{
-                        element.currentScrollAnim = null;
-                        return;
-                    }}
-
-                    const elapsed = currentTime - startTime;
-                    if (elapsed < duration) {{
-                        const nextPos = start + (distance * (elapsed / duration));
-                        element.scrollTop = nextPos;
-                        lastPos = nextPos; 
-                        element.currentScrollAnim = requestAnimationFrame(step);
-                    }} else {{
-                        element.scrollTop = finalTarget;
-                        element.currentScrollAnim = null;
-                    }}
-                 }}
-                 element.currentScrollAnim = requestAnimationFrame(step);
-            }}
-
-            const handleUserScroll = (e) => {{
-                const el = e.target.closest && e.target.closest('.' + targetClass);
-                if (el) cancelAnim(el);
-            }};
-            document.addEventListener('wheel', handleUserScroll, {{passive: true}});
-            document.addEventListener('mousedown', handleUserScroll, {{passive: true}});
-            document.addEventListener('touchstart', handleUserScroll, {{passive: true}});
-
-            const observer = new MutationObserver((mutations) => {{
-                const widgets = document.querySelectorAll('.' + targetClass);
-                widgets.forEach(w => {{
-                    const inner = w.querySelector('div[data-scroll-mode]');
-                    const mode = inner ? inner.getAttribute('data-scroll-mode') : 'fast';
-                    const target = w.scrollHeight - w.clientHeight;
-                    
-                    if (mode === 'fast') {{
-                        w.scrollTop = target;
-                    }} else {{
-                        // Sticky Scroll Logic
-                        const isNearBottom = w.scrollTop > target - STICKY_THRESHOLD;
-                        if (isNearBottom && w.scrollTop < target - 2) {{
-                            animateScroll(w, target);
-                        }}
-                    }}
-                }});
-            }});
-            observer.observe(document.body, {{ childList: true, subtree: true }});
-        }})();
-        """
-        display(Javascript(js))
 
     def append_text(self, text, styles=None):
         """
@@ -138,69 +657,137 @@ class ScrollingTranscriptWidget:
             styles (dict): Optional dictionary for keyword highlighting. 
                            Format: {"word": {"color": "red", "bold": True}}
         """
-        cid = len(self.chunk_ids) + 1
-        self.chunk_ids.append(cid)
-        
-        # Strip newlines for continuous flow as per best practice
-        clean_text = text.replace("\n", " ")
-        if styles:
-            formatted = self._format_highlight_html(clean_text, styles)
+        formatted = self._format_highlight_html(text, styles) if styles else None
+        # Chunks are stored as (is_html, data). Plain text is kept raw and only
+        # escaped if a new view needs a full reset.
+        if formatted is None:
+            chunk = (False, text.translate(_NEWLINE_TABLE) + " ")
         else:
-            formatted = html.escape(clean_text)
-            
-        self.chunks[cid] = formatted + " "
-        self._render()
+            chunk = (True, formatted + " ")
+
+        with self._lock:
+            was_idle = not self._pending
+            if len(self.chunks) == self.max_chunks:
+                self._pending_evictions += 1
+            self.chunks.append(chunk)
+            self._pending.append(chunk)
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="scrolling-transcript-flush", daemon=True
+                )
+                self._flusher.start()
+            elif was_idle:
+                self._wakeup.notify()
+
+    def flush(self):
+        """Sends appended text that is still waiting for the next batch right away."""
+        with self._lock:
+            if not self._pending and not self._pending_evictions:
+                return
+            self._seq += 1
+            msg = {"op": "append", "chunks": self._pending, "evict": self._pending_evictions, "seq": self._seq}
+            self._pending = []
+            self._pending_evictions = 0
+            self.html_widget.send(msg)
 
     def set_live_mode(self, is_live: bool):
         """Switches between 'fast' jump (history) and 'slow' scroll (live)."""
-        self.is_live = is_live
-        self._render()
+        with self._lock:
+            self.is_live = is_live
+            self.flush()
+            self._wakeup.notify()
+            self.html_widget.scroll_mode = "slow" if is_live else "fast"
 
-    def _format_highlight_html(self, text, styles):
-        safe = html.escape(text)
-        if not styles: return safe
-        
-        # Normalize keys
-        norm_styles = {k.lower(): v for k, v in styles.items()}
-        escaped_words = [re.escape(w).replace(r"\ ", r"\s+") for w in norm_styles.keys()]
-        escaped_words.sort(key=len, reverse=True)
-        
-        if not escaped_words: return safe
+    def _flush_loop(self):
+        """Body of the flusher thread: sends one batch per burst of appends."""
+        has_pending = lambda: self._pending or self._pending_evictions
+        with self._lock:
+            while True:
+                if not self._wakeup.wait_for(has_pending, timeout=_FLUSHER_IDLE_TIMEOUT):
+                    self._flusher = None
+                    return
+                start = time.monotonic()
+                # Let the rest of the burst arrive; wait() releases the lock.
+                # The interval is re-read after every wakeup so switching to
+                # live mode shortens a history batch that is already waiting.
+                while True:
+                    interval = _BATCH_INTERVAL if self.is_live else _HISTORY_BATCH_INTERVAL
+                    remaining = start + interval - time.monotonic()
+                    if remaining <= 0:
+                        self.flush()
+                        break
+                    self._wakeup.wait(remaining)
+                    if not has_pending():
+                        # Flushed by someone else; the next burst gets a
+                        # fresh window.
+                        break
+
+    def _handle_msg(self, _widget, content, _buffers):
+        if content.get("op") == "sync":
+            with self._lock:
+                behind = content.get("seq", 0) < self._seq
+                # Batched text goes out as a normal append first, so a reset
+                # carries the same seq and a frontend that caught up in the
+                # meantime can skip it.
+                self.flush()
+                if behind:
+                    self._render()
 
-        pattern = re.compile(r"\b(" + "|".join(escaped_words) + r")\b", re.IGNORECASE)
+    def _format_highlight_html(self, text, styles):
+        """Returns `text` as escaped HTML with keywords highlighted, or None if no keyword occurs."""
+        pattern, prefix_map, probes = self._highlight_rules(styles)
+        if pattern is None: return None
 
-        def style_to_css(st):
-            parts = []
-            if st.get("color"): parts.append(f"color:{st['color']}")
-            bg = st.get("bg") or st.get("background")
-            if bg: parts.append(f"background:{bg};padding:0 2px;border-radius:2px")
-            if st.get("bold"): parts.append("font-weight:700")
-            if st.get("italic"): parts.append("font-style:italic")
-            if st.get("underline"): parts.append("text-decoration:underline")
-            return ";".join(parts)
+        # Most streamed chunks contain no keyword at all; a plain substring
+        # probe is much cheaper than escaping and running the regex.
+        lower = text.lower()
+        if not any(p in lower for p in probes): return None
 
         def repl(m):
             original = m.group(0)
-            css = style_to_css(norm_styles.get(original.lower(), {}))
-            return f"<span style='{css}'>{original}</span>" if css else original
+            prefix = prefix_map.get(original.lower())
+            return prefix + original + "</span>" if prefix else original
 
-        return pattern.sub(repl, safe)
+        safe = text.translate(_HTML_ESCAPE_TABLE)
+        highlighted, count = pattern.subn(repl, safe)
+        return highlighted if count else None
 
-    def _render(self):
-        full_html = "".join(self.chunks[cid] for cid in self.chunk_ids)
-        scroll_mode = "slow" if self.is_live else "fast"
-        
-        wrapped = f"""
-        <div data-scroll-mode="{scroll_mode}" style="
-            font-family: Inter, -apple-system, sans-serif; 
-            font-size: {self.font_size}; 
-            line-height: 1.6; 
-            color: {self.text_color}; 
-            background-color: {self.bg_color}; 
-            padding: 5px; 
-            border-radius: 4px; 
-            white-space: pre-wrap;">
-            {full_html}
-        </div>
+    def _highlight_rules(self, styles):
+        """Returns the compiled keyword pattern, per-keyword opening <span> tags and substring probes for `styles`.
+
+        Streams usually pass the same dict on every call, so results are cached
+        by identity and reused as long as the dict's contents are unchanged.
         """
-        self.html_widget.value = wrapped
+        cached = self._style_cache.get(id(styles))
+        if cached is not None and cached[0] == styles:
+            return cached[1:]
+
+        # Normalize keys; keywords whose style yields no CSS are left out entirely.
+        prefix_map = {}
+        for w, st in styles.items():
+            css = _style_to_css(st)
+            if css: prefix_map[w.lower()] = f"<span style='{css}'>"
+        escaped_words = [re.escape(w).replace(r"\ ", r"\s+") for w in prefix_map.keys()]
+        escaped_words.sort(key=len, reverse=True)
+
+        pattern = None
+        if escaped_words:
+            pattern = re.compile(r"\b(" + "|".join(escaped_words) + r")\b", re.IGNORECASE)
+        # Multi-word keywords match across any whitespace, so probe for their first word only.
+        probes = tuple({(w.split() or [w])[0] for w in prefix_map})
+
+        if len(self._style_cache) >= _STYLE_CACHE_SIZE:
+            self._style_cache.clear()
+        snapshot = {k: dict(v) for k, v in styles.items()}
+        self._style_cache[id(styles)] = (snapshot, pattern, prefix_map, probes)
+        return pattern, prefix_map, probes
+
+    def _render(self):
+        """Sends the full transcript; only used when a page's model asks to sync."""
+        with self._lock:
+            # The reset already covers anything still waiting to be batched.
+            if self._pending or self._pending_evictions:
+                self._seq += 1
+            self._pending = []
+            self._pending_evictions = 0
+            self.html_widget.send({"op": "reset", "chunks": list(self.chunks), "seq": self._seq})
@@ -0,0 +1,156 @@
+import time
+
+import pytest
+
+from scrolling_transcript import widget as widget_module
+from scrolling_transcript import ScrollingTranscriptWidget
+
+
+def make_widget(**kwargs):
+    """Returns a widget whose comm messages are recorded as (time, msg) pairs."""
+    w = ScrollingTranscriptWidget(**kwargs)
+    w.sent = []
+    w.html_widget.send = lambda msg: w.sent.append((time.monotonic(), msg))
+    return w
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.002)
+    return True
+
+
+def test_burst_goes_out_as_one_batch():
+    w = make_widget()
+    for word in ["one", "two\nlines", "<b>"]:
+        w.append_text(word)
+    w.flush()
+
+    assert [msg for _, msg in w.sent] == [{
+        "op": "append",
+        "chunks": [(False, "one "), (False, "two lines "), (False, "<b> ")],
+        "evict": 0,
+        "seq": 1,
+    }]
+
+
+def test_highlighted_chunks_are_escaped_html():
+    w = make_widget()
+    w.append_text("a <Hit> here", styles={"hit": {"color": "red"}})
+    w.flush()
+
+    (_, msg), = w.sent
+    assert msg["chunks"] == [(True, "a &lt;<span style='color:red'>Hit</span>&gt; here ")]
+
+
+def test_evict_counts_follow_max_chunks():
+    w = make_widget(max_chunks=2)
+    for word in "abc":
+        w.append_text(word)
+    w.flush()
+    w.append_text("d")
+    w.flush()
+
+    assert [msg["evict"] for _, msg in w.sent] == [1, 1]
+    assert list(w.chunks) == [(False, "c "), (False, "d ")]
+
+
+def test_flush_without_pending_sends_nothing():
+    w = make_widget()
+    w.flush()
+    assert w.sent == []
+
+
+def test_live_batches_go_out_within_a_frame():
+    w = make_widget()
+    w.set_live_mode(True)
+    start = time.monotonic()
+    w.append_text("live")
+
+    assert wait_for(lambda: w.sent)
+    assert w.sent[0][0] - start < 0.1
+
+
+def test_history_batches_wait_for_the_longer_interval():
+    w = make_widget()
+    start = time.monotonic()
+    w.append_text("history")
+
+    assert wait_for(lambda: w.sent)
+    assert w.sent[0][0] - start >= widget_module._HISTORY_BATCH_INTERVAL - 0.01
+
+
+def test_switching_to_live_does_not_keep_the_history_deadline():
+    w = make_widget()
+    w.append_text("history")
+    time.sleep(0.05)
+    w.set_live_mode(True)
+    assert len(w.sent) == 1
+
+    start = time.monotonic()
+    w.append_text("live")
+    assert wait_for(lambda: len(w.sent) == 2)
+    assert w.sent[1][0] - start < 0.1
+
+
+def test_flusher_exits_when_idle_and_restarts(monkeypatch):
+    monkeypatch.setattr(widget_module, "_FLUSHER_IDLE_TIMEOUT", 0.05)
+    w = make_widget()
+    w.set_live_mode(True)
+    w.append_text("first")
+    first = w._flusher
+    assert first is not None
+
+    assert wait_for(lambda: w._flusher is None)
+    first.join(1.0)
+    assert not first.is_alive()
+
+    w.append_text("second")
+    assert w._flusher is not None and w._flusher is not first
+    assert wait_for(lambda: len(w.sent) == 2)
+    assert w.sent[1][1]["chunks"] == [(False, "second ")]
+
+
+def test_render_replaces_pending_chunks():
+    w = make_widget(max_chunks=3)
+    for word in "abcd":
+        w.append_text(word)
+    w._render()
+    time.sleep(widget_module._HISTORY_BATCH_INTERVAL + 0.05)
+
+    assert [msg for _, msg in w.sent] == [{
+        "op": "reset",
+        "chunks": [(False, "b "), (False, "c "), (False, "d ")],
+        "seq": 1,
+    }]
+
+
+def test_sync_from_a_current_frontend_sends_no_reset():
+    w = make_widget()
+    w.append_text("a")
+    w.flush()
+    w.append_text("b")
+    w._handle_msg(w.html_widget, {"op": "sync", "seq": 1}, [])
+
+    assert [msg["op"] for _, msg in w.sent] == ["append", "append"]
+    assert [msg["seq"] for _, msg in w.sent] == [1, 2]
+
+
+def test_sync_from_a_frontend_that_is_behind_resets_it():
+    w = make_widget()
+    w.append_text("a")
+    w.flush()
+    w._handle_msg(w.html_widget, {"op": "sync", "seq": 0}, [])
+
+    assert [msg for _, msg in w.sent][-1] == {"op": "reset", "chunks": [(False, "a ")], "seq": 1}
+
+
+@pytest.mark.parametrize("value", [0, -1, 1.5, True])
+def test_rejects_non_positive_sizes(value):
+    with pytest.raises(ValueError):
+        ScrollingTranscriptWidget(max_chunks=value)
+    with pytest.raises(ValueError):
+        ScrollingTranscriptWidget(page_size=value)